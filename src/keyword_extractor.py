@@ -3,23 +3,53 @@
 from __future__ import annotations
 
 import argparse
+import functools
+import math
+import os
 import pathlib
 import sys
 import textwrap
+import weakref
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
+import numpy as np
 import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from spacy.attrs import IS_PUNCT, IS_STOP, LEMMA
 from tabulate import tabulate
 
 if TYPE_CHECKING:
-    from collections.abc import Generator, Iterable
+    from collections.abc import Generator, Iterable, Iterator
     from typing import Self
 
-    from spacy.tokens.token import Token
+    from spacy.language import Language
+    from spacy.tokens.doc import Doc
 
 Keyword = str
+Preprocessed = tuple[str, list[tuple[str, str]]]
+
+_BATCH_SIZE = 64
+_WRAPPER = textwrap.TextWrapper()
+
+
+@functools.cache
+def _load_language_model() -> Language:
+    """Load the spaCy language model used for pre-processing.
+
+    The model is loaded once and shared between keyword extractors.
+
+    Returns
+    -------
+    Language
+        The language model, with a sentencizer added.
+
+    """
+    # The lemmatiser relies on part-of-speech tags, which in turn need
+    # tok2vec, so only the components we have no use for are excluded.
+    language_model = spacy.load("en_core_web_sm", exclude=["parser", "senter", "ner"])
+    language_model.add_pipe("sentencizer", first=True)
+    return language_model
 
 
 @dataclass(frozen=True)
@@ -73,22 +103,19 @@ class KeywordSummary:
             Formatted table containing the summary.
 
         """
-        sentences = [
-            "\n\n".join(
-                textwrap.fill(sentence)
-                for metadata in self.data.values()
-                for sentence in metadata.sentences
-            )
-        ]
-
-        table = {
-            "Word": [metadata.keyword for metadata in self.data.values()],
-            "Occurrences": [metadata.occurrences for metadata in self.data.values()],
-            "Documents": [
-                ", ".join(metadata.document_names) for metadata in self.data.values()
-            ],
-            "Sentences": sentences,
+        table: dict[str, list[str | int]] = {
+            "Word": [],
+            "Occurrences": [],
+            "Documents": [],
+            "Sentences": [],
         }
+        for metadata in self.data.values():
+            table["Word"].append(metadata.keyword)
+            table["Occurrences"].append(metadata.occurrences)
+            table["Documents"].append(", ".join(metadata.document_names))
+            table["Sentences"].append(
+                "\n\n".join(_WRAPPER.fill(sentence) for sentence in metadata.sentences)
+            )
         return tabulate(table, headers="keys", tablefmt="fancy_grid")
 
 
@@ -99,54 +126,216 @@ class KeywordExtractor:
     words, and lemmatisation) and keywords are selected by applying tf-idf over
     sentences, using the implementation in scikit-learn.
 
+    Documents are pre-processed in batches, and can be distributed across
+    several worker processes with the `n_process` argument. Each document is
+    split into sentences and lemmatised once, and the result is reused by
+    later calls to `fit` and `transform` on the same document.
+
     """
 
-    def __init__(self: Self, n_keywords: int = 10) -> None:
+    def __init__(self: Self, n_keywords: int = 10, n_process: int = 1) -> None:
         """Construct a keyword extractor.
 
         Parameters
         ----------
         n_keywords : int
             The number of keywords to extract (default 10).
+        n_process : int
+            The number of processes spaCy uses for pre-processing (default 1).
 
         Returns
         -------
         None
 
+        Raises
+        ------
+        ValueError
+            If `n_keywords` or `n_process` is less than 1.
+
         """
-        self.language_model = spacy.load(
-            "en_core_web_sm", disable=["tok2vec", "parser", "ner"]
+        if n_keywords < 1:
+            msg = f"n_keywords must be at least 1, got {n_keywords}"
+            raise ValueError(msg)
+        if n_process < 1:
+            msg = f"n_process must be at least 1, got {n_process}"
+            raise ValueError(msg)
+
+        self.language_model = _load_language_model()
+        self.n_process = n_process
+        self.n_keywords = n_keywords
+        self.tfidf = TfidfVectorizer()
+        self.keywords: frozenset[Keyword] = frozenset()
+        self._sentences: weakref.WeakKeyDictionary[Document, list[tuple[str, str]]] = (
+            weakref.WeakKeyDictionary()
         )
-        self.language_model.add_pipe("sentencizer")
-        self.tfidf = TfidfVectorizer(max_features=n_keywords)
-        self.keywords: set[str] = set()
 
     @staticmethod
-    def _lemmatise_and_remove_stops(
-        text: Iterable[Token],
-    ) -> Generator[str, None, None]:
-        """Lemmatise tokens whilst dropping stop words and punctuation.
+    def _lemmatise_sentences(document: Doc) -> Generator[tuple[str, str], None, None]:
+        """Lemmatise sentences whilst dropping stop words and punctuation.
+
+        Token attributes are read for the whole document at once with
+        `Doc.to_array`, rather than accessed token by token.
 
         Parameters
         ----------
-        text : Iterable[Token]
-            Tokens to lemmatise and drop stop words from.
+        document : Doc
+            Processed document to split into sentences and lemmatise.
 
         Yields
         ------
-        str
-            Lemmatised and lower cased form of token.
+        tuple[str, str]
+            Text of a sentence, and the lemmatised and lower cased forms of its
+            tokens, separated by spaces.
+
+        """
+        attributes = document.to_array([LEMMA, IS_STOP, IS_PUNCT])
+        keep = (attributes[:, 1] == 0) & (attributes[:, 2] == 0)
+        strings = document.vocab.strings
+        for sentence in document.sents:
+            span = slice(sentence.start, sentence.end)
+            lemmas = attributes[span, 0][keep[span]].tolist()
+            yield sentence.text, " ".join(strings[lemma].lower() for lemma in lemmas)
+
+    def _pipe(self: Self, texts: list[str]) -> Iterator[Doc]:
+        """Process texts with the language model in batches.
+
+        Batches are shared out between processes, so no more processes are
+        started than there are batches to fill.
+
+        Parameters
+        ----------
+        texts : list[str]
+            Texts to process.
+
+        Returns
+        -------
+        Iterator[Doc]
+            Processed documents, in the same order as the texts.
 
         """
-        for token in text:
-            if not token.is_stop and not token.is_punct:
-                yield token.lemma_.lower()
+        n_batches = math.ceil(len(texts) / _BATCH_SIZE)
+        n_process = max(1, min(self.n_process, n_batches))
+        return self.language_model.pipe(
+            texts, batch_size=_BATCH_SIZE, n_process=n_process
+        )
+
+    def _preprocess(self: Self, documents: Iterable[Document]) -> list[Preprocessed]:
+        """Split documents into sentences and lemmatise them.
+
+        The result for each document is cached for as long as the document
+        itself is alive, so documents already seen by `fit` or `transform` are
+        not processed by spaCy again.
+
+        Parameters
+        ----------
+        documents : Iterable[Document]
+            Documents to pre-process.
+
+        Returns
+        -------
+        list[Preprocessed]
+            For each document, its name and a list of its sentences, each
+            paired with the sentence's space separated lemmas after dropping
+            stop words.
+
+        """
+        documents = list(documents)
+        uncached = list(
+            dict.fromkeys(
+                document for document in documents if document not in self._sentences
+            )
+        )
+        if uncached:
+            texts = [document.text for document in uncached]
+            for document, processed in zip(uncached, self._pipe(texts), strict=True):
+                self._sentences[document] = list(self._lemmatise_sentences(processed))
+        return [(document.name, self._sentences[document]) for document in documents]
+
+    def _fit_preprocessed(
+        self: Self, preprocessed: list[Preprocessed]
+    ) -> list[Keyword]:
+        """Fit the keyword extractor to pre-processed documents.
+
+        Parameters
+        ----------
+        preprocessed : list[Preprocessed]
+            Documents pre-processed by `_preprocess`.
+
+        Returns
+        -------
+        list[Keyword]
+            A list of the most prevalent keywords.
+
+        """
+        lemmatised_sentences = [
+            lemmatised for _, sentences in preprocessed for _, lemmatised in sentences
+        ]
+        weights = self.tfidf.fit_transform(lemmatised_sentences)
+
+        # Select the words with the highest total weight across sentences.
+        # Partitioning avoids sorting the whole vocabulary.
+        scores = np.asarray(weights.sum(axis=0)).ravel()
+        n_keywords = min(self.n_keywords, len(scores))
+        top = np.argpartition(-scores, n_keywords - 1)[:n_keywords]
+        self.keywords = frozenset(self.tfidf.get_feature_names_out()[top])
+        return list(self.keywords)
+
+    def _transform_preprocessed(
+        self: Self, preprocessed: list[Preprocessed]
+    ) -> KeywordSummary:
+        """Extract keyword summary from pre-processed documents.
+
+        Parameters
+        ----------
+        preprocessed : list[Preprocessed]
+            Documents pre-processed by `_preprocess`.
+
+        Returns
+        -------
+        KeywordSummary
+            A summary of extracted keywords.
+
+        """
+        if not self.keywords:
+            return KeywordSummary({})
+
+        document_names = []
+        texts = []
+        lemmatised_sentences = []
+        for name, sentences in preprocessed:
+            for text, lemmatised in sentences:
+                document_names.append(name)
+                texts.append(text)
+                lemmatised_sentences.append(lemmatised)
+
+        # Tokenise sentences the same way as during fitting, producing a
+        # binary matrix of which keywords (columns) occur in which sentences
+        # (rows).
+        vocabulary = sorted(self.keywords)
+        vectoriser = CountVectorizer(
+            analyzer=self.tfidf.build_analyzer(), vocabulary=vocabulary, binary=True
+        )
+        matches = vectoriser.transform(lemmatised_sentences).tocsc()
+        rows_by_column = matches.indices.tolist()
+        column_bounds = matches.indptr.tolist()
+
+        summary = {}
+        for column, keyword in enumerate(vocabulary):
+            rows = rows_by_column[column_bounds[column] : column_bounds[column + 1]]
+            summary[keyword] = KeywordMetadata(
+                keyword,
+                len(rows),
+                {document_names[row] for row in rows},
+                [texts[row] for row in rows],
+            )
+        return KeywordSummary(summary)
 
     def fit(self: Self, documents: Iterable[Document]) -> list[Keyword]:
         """Fit the keyword extractor to documents.
 
         This finds the most prevalent keywords, applying tf-idf across
-        sentences after lemmatising tokens and dropping stop words.
+        sentences after lemmatising tokens and dropping stop words, and keeping
+        the words with the highest total tf-idf weight.
 
         Parameters
         ----------
@@ -159,17 +348,7 @@ class KeywordExtractor:
             A list of the most prevalent keywords.
 
         """
-        texts = (document.text for document in documents)
-        lemmatised_sentences = (
-            self._lemmatise_and_remove_stops(sentence)
-            for document in self.language_model.pipe(texts)
-            for sentence in document.sents
-        )
-        self.tfidf.fit(
-            " ".join(token for token in sentence) for sentence in lemmatised_sentences
-        )
-        self.keywords.update(self.tfidf.get_feature_names_out())
-        return list(self.keywords)
+        return self._fit_preprocessed(self._preprocess(documents))
 
     def transform(self: Self, documents: Iterable[Document]) -> KeywordSummary:
         """Extract keyword summary from new documents after fitting.
@@ -190,26 +369,14 @@ class KeywordExtractor:
             A summary of extracted keywords.
 
         """
-        summary = {}
-        for keyword in self.keywords:
-            metadata = KeywordMetadata(keyword)
-            for document in documents:
-                for sentence in self.language_model(document.text).sents:
-                    tokens = set(self._lemmatise_and_remove_stops(sentence))
-                    if keyword not in tokens:
-                        continue
-                    metadata.occurrences += 1
-                    metadata.document_names.add(document.name)
-                    metadata.sentences.append(sentence.text)
-            summary[keyword] = metadata
-        return KeywordSummary(summary)
+        return self._transform_preprocessed(self._preprocess(documents))
 
     def fit_transform(self: Self, documents: Iterable[Document]) -> KeywordSummary:
         """Fit to and extract keywords from a single corpus of documents.
 
         This method fits the most common keywords on a corpus of documents, and
         extracts a summary of the keyword prevalence from that same corpus of
-        documents.
+        documents. The documents are only pre-processed once.
 
         Parameters
         ----------
@@ -223,8 +390,38 @@ class KeywordExtractor:
             A summary of extracted keywords.
 
         """
-        self.fit(documents)
-        return self.transform(documents)
+        preprocessed = self._preprocess(documents)
+        self._fit_preprocessed(preprocessed)
+        return self._transform_preprocessed(preprocessed)
+
+
+def _positive_int(value: str) -> int:
+    """Parse a positive integer command line argument.
+
+    Parameters
+    ----------
+    value : str
+        Command line argument.
+
+    Returns
+    -------
+    int
+        Parsed integer.
+
+    Raises
+    ------
+    argparse.ArgumentTypeError
+        If the argument is not an integer of at least 1.
+
+    """
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        msg = f"invalid positive integer: {value!r}"
+        raise argparse.ArgumentTypeError(msg)
+    return number
 
 
 def parse_args(argv: list[str]) -> argparse.Namespace:
@@ -244,7 +441,15 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         formatter_class=argparse.ArgumentDefaultsHelpFormatter
     )
-    parser.add_argument("-n", default=5, type=int, help="Number of keywords to extract")
+    parser.add_argument(
+        "-n", default=5, type=_positive_int, help="Number of keywords to extract"
+    )
+    parser.add_argument(
+        "-j",
+        default=os.cpu_count() or 1,
+        type=_positive_int,
+        help="Number of processes to use for pre-processing",
+    )
     parser.add_argument(
         "paths", nargs="+", metavar="PATH", type=pathlib.Path, help="Input document"
     )
@@ -255,7 +460,7 @@ def main() -> None:  # pragma: no cover
     """Command line entry point."""
     args = parse_args(sys.argv[1:])
     documents = [Document.from_path(path) for path in args.paths]
-    extractor = KeywordExtractor(n_keywords=args.n)
+    extractor = KeywordExtractor(n_keywords=args.n, n_process=args.j)
     summary = extractor.fit_transform(documents)
     print(summary)
 
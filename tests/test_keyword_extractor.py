@@ -1,8 +1,10 @@
 """Tests for keyword_extractor."""
 
+import os
 import pathlib
 import textwrap
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from typing import NoReturn
 
 import pytest
 from keyword_extractor import (
@@ -61,8 +63,43 @@ def test_keyword_extractor_init(
     else:
         extractor = KeywordExtractor()
 
-    params = extractor.tfidf.get_params()
-    assert params.get("max_features") == n_keywords_attr
+    assert extractor.n_keywords == n_keywords_attr
+    assert extractor.tfidf.get_params().get("max_features") is None
+    assert extractor.n_process == 1
+    assert extractor.language_model is KeywordExtractor().language_model
+
+
+@pytest.mark.parametrize("n_keywords", [0, -1])
+def test_keyword_extractor_init_invalid_n_keywords(n_keywords: int) -> None:
+    """Test KeywordExtractor.__init__ rejects fewer than one keyword."""
+    with pytest.raises(ValueError, match="n_keywords"):
+        KeywordExtractor(n_keywords=n_keywords)
+
+
+def test_keyword_extractor_init_invalid_n_process() -> None:
+    """Test KeywordExtractor.__init__ rejects fewer than one process."""
+    with pytest.raises(ValueError, match="n_process"):
+        KeywordExtractor(n_process=0)
+
+
+@pytest.mark.parametrize(
+    ("n_texts", "n_process", "expected"),
+    [(1, 4, 1), (64, 4, 1), (65, 4, 2), (500, 4, 4)],
+)
+def test_keyword_extractor_pipe_caps_processes(
+    monkeypatch: pytest.MonkeyPatch, n_texts: int, n_process: int, expected: int
+) -> None:
+    """Test KeywordExtractor only starts as many processes as there are batches."""
+    extractor = KeywordExtractor(n_process=n_process)
+    calls = []
+
+    def pipe(_texts: list[str], **kwargs: int) -> Iterator[object]:
+        calls.append(kwargs)
+        return iter([])
+
+    monkeypatch.setattr(extractor.language_model, "pipe", pipe)
+    extractor._pipe(["text"] * n_texts)  # noqa: SLF001
+    assert calls == [{"batch_size": 64, "n_process": expected}]
 
 
 def test_keyword_extractor_fit() -> None:
@@ -71,6 +108,18 @@ def test_keyword_extractor_fit() -> None:
     keywords = set(extractor.fit(TEST_DOCUMENTS))
     for word in ("rick", "morty", "forever"):
         assert word in keywords
+    assert extractor.keywords == keywords
+
+
+def test_keyword_extractor_fit_selects_by_tfidf() -> None:
+    """Test KeywordExtractor.fit ranks words by total tf-idf weight."""
+    # "apple" is the most frequent word, but it is concentrated in a single
+    # sentence, whereas "banana" is the only word in each of several sentences.
+    document = Document(
+        "fruit.txt", "Apple apple apple apple apple cherry. Banana. Banana. Banana."
+    )
+    extractor = KeywordExtractor(n_keywords=1)
+    assert extractor.fit([document]) == ["banana"]
 
 
 def test_keyword_extractor_transform() -> None:
@@ -96,6 +145,40 @@ def test_keyword_extractor_transform() -> None:
     assert len(summary_forever.sentences) == 3
 
 
+def test_keyword_extractor_transform_repeated_keyword() -> None:
+    """Test a sentence containing a keyword twice is recorded once."""
+    sentence = "Rick and Morty forever and forever."
+    document = Document("forever.txt", f"{sentence} Forever Morty.")
+    extractor = KeywordExtractor(n_keywords=5)
+    summary = extractor.fit_transform([document])
+
+    summary_forever = summary.data["forever"]
+    assert summary_forever.occurrences == len(summary_forever.sentences) == 2
+    assert summary_forever.sentences.count(sentence) == 1
+
+
+def test_keyword_extractor_transform_before_fit() -> None:
+    """Test KeywordExtractor.transform before fitting returns an empty summary."""
+    extractor = KeywordExtractor(n_keywords=5)
+    summary = extractor.transform(TEST_DOCUMENTS)
+    assert summary.data == {}
+
+
+def test_keyword_extractor_caches_preprocessing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test KeywordExtractor does not re-process documents it has seen."""
+    extractor = KeywordExtractor(n_keywords=5)
+    expected = extractor.fit_transform(TEST_DOCUMENTS)
+
+    def fail(texts: Iterable[str]) -> NoReturn:
+        pytest.fail(f"unexpected call to _pipe with {texts!r}")
+
+    monkeypatch.setattr(extractor, "_pipe", fail)
+    assert extractor.fit_transform(TEST_DOCUMENTS) == expected
+    assert extractor.transform(TEST_DOCUMENTS) == expected
+
+
 def test_keyword_extractor_fit_transform() -> None:
     """Test KeywordExtractor.fit_transform."""
     extractor = KeywordExtractor(n_keywords=5)
@@ -139,15 +222,39 @@ def test_keyword_summary() -> None:
     assert str(summary) == expected
 
 
+def test_keyword_summary_multiple_keywords() -> None:
+    """Test KeywordSummary lists each keyword's sentences in its own row."""
+    data = {
+        "first": KeywordMetadata("first", 1, {"a.txt"}, ["the first keyword"]),
+        "second": KeywordMetadata("second", 1, {"b.txt"}, ["the second keyword"]),
+    }
+    first_row, second_row = str(KeywordSummary(data)).split("├")
+    assert "the first keyword" in first_row
+    assert "the second keyword" not in first_row
+    assert "the second keyword" in second_row
+
+
 @pytest.mark.parametrize(
-    ("argv", "n_keywords", "paths"),
+    ("argv", "n_keywords", "n_process", "paths"),
     [
-        ("foo.txt", 5, ["foo.txt"]),
-        ("-n 3 foo.txt bar.txt", 3, "foo.txt bar.txt".split()),
+        ("foo.txt", 5, os.cpu_count() or 1, ["foo.txt"]),
+        ("-n 3 -j 2 foo.txt bar.txt", 3, 2, "foo.txt bar.txt".split()),
     ],
 )
-def test_parse_args(argv: str, n_keywords: int, paths: Iterable[str]) -> None:
+def test_parse_args(
+    argv: str, n_keywords: int, n_process: int, paths: Iterable[str]
+) -> None:
     """Test parse_args."""
     args = parse_args(argv.split())
     assert args.n == n_keywords
+    assert args.j == n_process
     assert args.paths == [pathlib.Path(path) for path in paths]
+
+
+@pytest.mark.parametrize(
+    "argv", ["-n 0 foo.txt", "-n -1 foo.txt", "-j 0 foo.txt", "-j x foo.txt"]
+)
+def test_parse_args_invalid_counts(argv: str) -> None:
+    """Test parse_args rejects non-positive numbers of keywords and processes."""
+    with pytest.raises(SystemExit):
+        parse_args(argv.split())